@@ -8,38 +8,220 @@ Vault APIにアップロードする。
 
 import asyncio
 import aiohttp
+import contextlib
+import functools
 import json
 import os
+import random
+import re
+import socket
 import ssl
+import tempfile
+import time
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Any, Awaitable, Callable, List, Dict, Optional, Tuple
 import argparse
 import logging
 from datetime import datetime
 
 
+# 日付ディレクトリ名（YYYY-MM-DD）の形式チェック用
+_DATE_RE = re.compile(r'\A\d{4}-\d{2}-\d{2}\Z')
+
+# アップロードするファイルパートの固定値
+CONTENT_TYPE = 'application/json'
+FILENAME = 'result.json'
+
+# mtimeがこの時間内（ナノ秒）のディレクトリ一覧はキャッシュしない
+# mtimeの粒度は粗く、走査と同じ刻みで追加されたエントリをmtimeの変化で検知できないため（gitの"racily clean"対策）
+_RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+# 一括アップロード時に進捗ログを出す間隔（完了ファイル数）
+_PROGRESS_INTERVAL = 50
+
+# リトライ対象のHTTPステータスとバックオフ設定（秒）
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+_RETRY_BASE_DELAY = 0.5
+_RETRY_MAX_DELAY = 30.0
+# Retry-Afterヘッダーで指示された待機秒数の上限
+_RETRY_AFTER_MAX_DELAY = _RETRY_MAX_DELAY * 2
+
+
+@functools.lru_cache(maxsize=None)
+def _get_ssl_context(verify_ssl: bool) -> ssl.SSLContext:
+    """
+    プロセス内で共有するSSLコンテキストを取得（検証有無ごとに1つ）
+    CAストアの読み込みをセッション生成毎に繰り返さない
+    """
+    ssl_context = ssl.create_default_context()
+    if not verify_ssl:
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+    return ssl_context
+
+
 class SEDSummaryUploader:
     """SEDサマリーアップロードクラス"""
     
-    def __init__(self, upload_url: str = "https://api.hey-watch.me/upload/analysis/sed-summary", verify_ssl: bool = True):
+    def __init__(self, upload_url: str = "https://api.hey-watch.me/upload/analysis/sed-summary", verify_ssl: bool = True,
+                 concurrency: int = 16, connection_limit: Optional[int] = None,
+                 keepalive_timeout: float = 75, state_path: Optional[Path] = None,
+                 force: bool = False, batch_size: int = 1, max_attempts: int = 5,
+                 raw_body: bool = False, ipv4_only: bool = False):
         self.upload_url = upload_url
         self.base_dir = Path("/Users/kaya.matsumoto/data/data_accounts")
         self.verify_ssl = verify_ssl
+        # 同時アップロード数の上限
+        self.concurrency = max(1, concurrency)
+        # コネクションプール設定（未指定時は同時実行数に合わせる）
+        self.connection_limit = connection_limit or self.concurrency
+        self.keepalive_timeout = keepalive_timeout
+        # アップロード済みインデックス（force指定時は無視して全件アップロード）
+        self._state_path = state_path or Path("~/.cache/sed_uploader.json").expanduser()
+        self.force = force
+        # バッチアップロード（1なら従来通り1ファイル1リクエスト）
+        self.batch_size = max(1, batch_size)
+        self.batch_upload_url = upload_url.rstrip('/') + "/batch"
+        self._batch_supported = True
+        # 429/5xx・接続エラー時の最大試行回数
+        self.max_attempts = max(1, max_attempts)
+        # 単体アップロードでmultipartを使わず、JSONをそのまま本文として送る
+        # （device_id/dateはクエリパラメータ。サーバー側の対応が必要）
+        self.raw_body = raw_body
+        # アップロード先への接続をIPv4に限定（AAAA解決を省略。IPv6のみの環境では使用不可）
+        self.ipv4_only = ipv4_only
         
         # SSL設定を準備
-        if not self.verify_ssl:
-            self.ssl_context = ssl.create_default_context()
-            self.ssl_context.check_hostname = False
-            self.ssl_context.verify_mode = ssl.CERT_NONE
-        else:
-            self.ssl_context = None
+        self.ssl_context = _get_ssl_context(self.verify_ssl)
+        
+        # 動的な同時実行数制御（upload_all_summaries毎に初期化）
+        # 429を受けたら上限を半減し、成功が続けばconcurrencyまで1ずつ戻す
+        self._admission: Optional[asyncio.Condition] = None
+        self._inflight = 0
+        self._cmax = self.concurrency
+        self._success_streak = 0
+        # 上限を縮小した回数（同じ混雑に対する429で重ねて縮小しないための世代番号）
+        self._shrink_epoch = 0
+        
+        # 全アップロードで共有するセッション（初回利用時に生成）
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # ディレクトリ一覧キャッシュ: (path, 名前フィルタ) -> (st_mtime_ns, [(name, path), ...])
+        self._dir_cache: Dict[Tuple[str, Optional[str]], Tuple[int, List[Tuple[str, str]]]] = {}
         
-        # ログ設定
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
         self.logger = logging.getLogger(__name__)
+        
+        # "upload_url device_id/date" -> [st_mtime_ns, st_size]
+        self._uploaded: Dict[str, List[int]] = self._load_upload_state()
+    
+    def _load_upload_state(self) -> Dict[str, List[int]]:
+        """アップロード済みインデックスを読み込み"""
+        try:
+            with open(self._state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning("アップロード済みインデックスを読み込めません: %s - %s", self._state_path, e)
+            return {}
+        
+        if not isinstance(state, dict):
+            self.logger.warning("アップロード済みインデックスの形式が不正なため無視します: %s", self._state_path)
+            return {}
+        return state
+    
+    def _save_upload_state(self) -> None:
+        """
+        アップロード済みインデックスを一時ファイル経由でアトミックに保存
+        一時ファイル名は実行毎に一意にし、同時に動く別プロセスと衝突しないようにする
+        """
+        tmp_path = None
+        try:
+            self._state_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self._state_path.parent,
+                                            prefix=self._state_path.name + ".", suffix=".tmp")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._uploaded, f)
+            os.replace(tmp_path, self._state_path)
+        except OSError as e:
+            self.logger.warning("アップロード済みインデックスを保存できません: %s - %s", self._state_path, e)
+            if tmp_path is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_path)
+    
+    def _upload_key(self, device_id: str, date: str) -> str:
+        """アップロード済みインデックスのキー（アップロード先URL毎に区別する）"""
+        return f"{self.upload_url} {device_id}/{date}"
+    
+    @staticmethod
+    def _file_signature(file_path: Path) -> List[int]:
+        """ファイルの変更検知用シグネチャ [st_mtime_ns, st_size]"""
+        st = os.stat(file_path)
+        return [st.st_mtime_ns, st.st_size]
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        共有ClientSessionを取得（未生成・クローズ済みの場合のみ新規作成）
+        同一ホストへのアップロードでkeep-alive接続を再利用する
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                ssl=self.ssl_context,
+                limit=self.connection_limit,
+                limit_per_host=self.connection_limit,
+                keepalive_timeout=self.keepalive_timeout,
+                enable_cleanup_closed=True,
+                # DNS解決結果を5分間キャッシュ（ipv4_only指定時のみIPv4に限定）
+                use_dns_cache=True,
+                ttl_dns_cache=300,
+                family=socket.AF_INET if self.ipv4_only else 0
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def aclose(self) -> None:
+        """共有セッションをクローズ"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def __aenter__(self) -> "SEDSummaryUploader":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+    
+    def _list_subdirs(self, path: str, name_re: Optional[re.Pattern] = None) -> List[Tuple[str, str]]:
+        """
+        ディレクトリ直下のサブディレクトリ一覧を取得
+        name_re指定時は名前が一致するものだけを残す（一覧取得時に枝刈りし、結果ごとキャッシュ）
+        mtimeが前回から変わっていなければキャッシュを返し、readdirを省略する
+        Returns: [(name, path), ...]
+        """
+        # 同じパスでもフィルタが違えば一覧が異なるため、パターンもキーに含める
+        cache_key = (path, name_re.pattern if name_re is not None else None)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            scan_ns = time.time_ns()
+        except FileNotFoundError:
+            # 探索中に削除されたディレクトリ
+            self._dir_cache.pop(cache_key, None)
+            return []
+        cached = self._dir_cache.get(cache_key)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+        
+        # os.scandirのDirEntryはreaddir時の種別情報をキャッシュするため、エントリ毎のstatを省ける
+        with os.scandir(path) as it:
+            subdirs = [(entry.name, entry.path) for entry in it
+                       if (name_re is None or name_re.match(entry.name))
+                       and entry.is_dir(follow_symlinks=False)]
+        if scan_ns - mtime_ns >= _RACY_MTIME_WINDOW_NS:
+            self._dir_cache[cache_key] = (mtime_ns, subdirs)
+        else:
+            # 変更直後のディレクトリは次回も読み直す
+            self._dir_cache.pop(cache_key, None)
+        return subdirs
     
     def find_all_summary_files(self) -> List[Tuple[str, str, Path]]:
         """
@@ -48,35 +230,42 @@ class SEDSummaryUploader:
         """
         summary_files = []
         
+        for device_id, device_path in self._list_devices():
+            summary_files.extend(self._find_device_summary_files(device_id, device_path))
+        
+        self.logger.info("合計 %d 個のサマリーファイルを発見", len(summary_files))
+        return summary_files
+    
+    def _list_devices(self) -> List[Tuple[str, str]]:
+        """
+        ベースディレクトリ直下のデバイスディレクトリ一覧を取得
+        Returns: [(device_id, device_path), ...]
+        """
         if not self.base_dir.exists():
-            self.logger.warning(f"ベースディレクトリが存在しません: {self.base_dir}")
-            return summary_files
+            self.logger.warning("ベースディレクトリが存在しません: %s", self.base_dir)
+            return []
         
         # パターン: /Users/kaya.matsumoto/data/data_accounts/{device_id}/{YYYY-MM-DD}/sed-summary/result.json
-        for device_dir in self.base_dir.iterdir():
-            if not device_dir.is_dir():
+        return self._list_subdirs(os.fspath(self.base_dir))
+    
+    def _find_device_summary_files(self, device_id: str, device_path: str) -> List[Tuple[str, str, Path]]:
+        """
+        1デバイス配下のSEDサマリーファイルを探索
+        Returns: [(device_id, date, file_path), ...]
+        """
+        summary_files = []
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        
+        # 日付形式（YYYY-MM-DD）以外のディレクトリは一覧取得時に除外し、配下は探索しない
+        for date, date_path in self._list_subdirs(device_path, _DATE_RE):
+            # Pathの組み立てを避け文字列で結合（Pathは戻り値用に1回だけ生成）
+            summary_file = f"{date_path}/sed-summary/result.json"
+            if not os.path.isfile(summary_file):
                 continue
-                
-            device_id = device_dir.name
-            
-            for date_dir in device_dir.iterdir():
-                if not date_dir.is_dir():
-                    continue
-                
-                date = date_dir.name
-                
-                # 日付形式の検証
-                try:
-                    datetime.strptime(date, "%Y-%m-%d")
-                except ValueError:
-                    continue
-                
-                summary_file = date_dir / "sed-summary" / "result.json"
-                if summary_file.exists():
-                    summary_files.append((device_id, date, summary_file))
-                    self.logger.debug(f"発見: {device_id}/{date} - {summary_file}")
-        
-        self.logger.info(f"合計 {len(summary_files)} 個のサマリーファイルを発見")
+            summary_files.append((device_id, date, Path(summary_file)))
+            if debug:
+                self.logger.debug("発見: %s/%s - %s", device_id, date, summary_file)
+        
         return summary_files
     
     def find_summary_file(self, device_id: str, date: str) -> Optional[Path]:
@@ -88,95 +277,361 @@ class SEDSummaryUploader:
         if file_path.exists():
             return file_path
         else:
-            self.logger.warning(f"ファイルが存在しません: {file_path}")
+            self.logger.warning("ファイルが存在しません: %s", file_path)
             return None
     
+    @staticmethod
+    def _retry_delay(attempt: int, retry_after: Optional[str]) -> float:
+        """
+        指数バックオフ＋ジッターの待機秒数を計算
+        Retry-Afterヘッダー（秒数）があればそれ以上待つ（ただし_RETRY_AFTER_MAX_DELAYで頭打ち）
+        """
+        delay = min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * 2 ** (attempt - 1)) + random.uniform(0, _RETRY_BASE_DELAY)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), _RETRY_AFTER_MAX_DELAY))
+        return delay
+    
+    @contextlib.asynccontextmanager
+    async def _admit(self):
+        """
+        同時実行数の上限(_cmax)に空きができるまで待ってから実行枠を確保
+        upload_all_summaries以外（admission未初期化）では制限しない
+        """
+        admission = self._admission
+        if admission is None:
+            yield
+            return
+        
+        async with admission:
+            await admission.wait_for(lambda: self._inflight < self._cmax)
+            self._inflight += 1
+        try:
+            yield
+        finally:
+            async with admission:
+                self._inflight -= 1
+                admission.notify(1)
+    
+    async def _adjust_concurrency(self, status: int, sent_epoch: int) -> None:
+        """
+        レスポンスに応じて同時実行数の上限を調整（429で半減、連続成功で+1）
+        送信後に既に縮小済みなら、同じ混雑に対する429とみなして重ねて縮小しない
+        """
+        if self._admission is None:
+            return
+        
+        async with self._admission:
+            if status == 429:
+                self._success_streak = 0
+                if self._cmax > 1 and sent_epoch == self._shrink_epoch:
+                    self._shrink_epoch += 1
+                    self._cmax = max(1, self._cmax // 2)
+                    self.logger.info("同時実行数の上限を %d に縮小（HTTP 429）", self._cmax)
+            elif status == 200:
+                self._success_streak += 1
+                if self._cmax < self.concurrency and self._success_streak >= self._cmax:
+                    self._success_streak = 0
+                    self._cmax += 1
+                    self.logger.debug("同時実行数の上限を %d に拡大", self._cmax)
+                    self._admission.notify_all()
+    
+    async def _post_with_retry(self, session: aiohttp.ClientSession, url: str,
+                               build_body: Callable[[contextlib.ExitStack], Awaitable[Any]],
+                               handle: Callable[[aiohttp.ClientResponse], Awaitable[Any]],
+                               label: str, **request_kwargs: Any) -> Any:
+        """
+        POSTを実行し、429/5xx・接続エラー時は指数バックオフで再試行
+        本文は試行毎に作り直し（ストリーミング送信のためファイルも開き直す）、
+        最終的なレスポンスをhandleに渡してその戻り値を返す
+        実行枠は試行毎に確保し、バックオフ待機中は解放する
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            with contextlib.ExitStack() as stack:
+                body = await build_body(stack)
+                try:
+                    async with self._admit():
+                        sent_epoch = self._shrink_epoch
+                        async with session.post(
+                            url,
+                            data=body,
+                            timeout=aiohttp.ClientTimeout(total=60),
+                            **request_kwargs
+                        ) as response:
+                            
+                            await self._adjust_concurrency(response.status, sent_epoch)
+                            if response.status not in _RETRY_STATUSES or attempt == self.max_attempts:
+                                return await handle(response)
+                            delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                            reason = f"HTTP {response.status}"
+                        
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    if attempt == self.max_attempts:
+                        raise
+                    delay = self._retry_delay(attempt, None)
+                    reason = repr(e)
+            
+            self.logger.warning("⏳ リトライ待機: %s - %s (%d/%d, %.1f秒後)",
+                                label, reason, attempt, self.max_attempts, delay)
+            await asyncio.sleep(delay)
+    
     async def upload_summary_file(self, session: aiohttp.ClientSession, 
                                  device_id: str, date: str, file_path: Path) -> bool:
         """
         単一のサマリーファイルをアップロード
         """
-        try:
-            self.logger.info(f"アップロード開始: {device_id}/{date}")
-            
-            # ファイル読み込み
-            with open(file_path, 'r', encoding='utf-8') as f:
-                file_content = f.read()
-            
-            # フォームデータ作成
+        async def build_body(stack: contextlib.ExitStack) -> Any:
+            # ファイルはバイナリモードで開き、aiohttpにチャンク単位でストリーミング送信させる
+            # （全体をメモリに読み込まず、読み込みはaiohttp側でexecutor上で行われる）
+            f = stack.enter_context(await asyncio.to_thread(open, file_path, 'rb'))
+            if self.raw_body:
+                return f
             form_data = aiohttp.FormData()
-            form_data.add_field('file', file_content, 
-                              filename='result.json', 
-                              content_type='application/json')
+            form_data.add_field('file', f, 
+                              filename=FILENAME, 
+                              content_type=CONTENT_TYPE)
             form_data.add_field('device_id', device_id)
             form_data.add_field('date', date)
-            
-            # アップロード実行
-            async with session.post(
-                self.upload_url,
-                data=form_data,
-                timeout=aiohttp.ClientTimeout(total=60)
-            ) as response:
-                
-                if response.status == 200:
-                    self.logger.info(f"✅ アップロード成功: {device_id}/{date}")
-                    return True
-                else:
-                    error_text = await response.text()
-                    self.logger.error(f"❌ アップロード失敗: {device_id}/{date} - "
-                                    f"HTTP {response.status}: {error_text}")
-                    return False
+            return form_data
+        
+        async def handle(response: aiohttp.ClientResponse) -> bool:
+            if response.status == 200:
+                self.logger.debug("✅ アップロード成功: %s/%s", device_id, date)
+                return True
+            else:
+                error_text = await response.text()
+                self.logger.error("❌ アップロード失敗: %s/%s - HTTP %d: %s",
+                                  device_id, date, response.status, error_text)
+                return False
+        
+        try:
+            self.logger.debug("アップロード開始: %s/%s", device_id, date)
+            if self.raw_body:
+                request_kwargs = {
+                    "params": {"device_id": device_id, "date": date},
+                    "headers": {"Content-Type": CONTENT_TYPE},
+                }
+            else:
+                request_kwargs = {}
+            return await self._post_with_retry(session, self.upload_url, build_body, handle,
+                                               f"{device_id}/{date}", **request_kwargs)
                     
         except aiohttp.ClientError as e:
-            self.logger.error(f"❌ 接続エラー: {device_id}/{date} - {e}")
-            return False
-        except json.JSONDecodeError as e:
-            self.logger.error(f"❌ JSON解析エラー: {device_id}/{date} - {e}")
+            self.logger.error("❌ 接続エラー: %s/%s - %s", device_id, date, e)
             return False
         except FileNotFoundError:
-            self.logger.error(f"❌ ファイルが見つかりません: {file_path}")
+            self.logger.error("❌ ファイルが見つかりません: %s", file_path)
             return False
         except Exception as e:
-            self.logger.error(f"❌ 予期しないエラー: {device_id}/{date} - {e}")
+            self.logger.error("❌ 予期しないエラー: %s/%s - %s", device_id, date, e)
             return False
     
+    async def upload_summary_batch(self, session: aiohttp.ClientSession,
+                                   batch: List[Tuple[str, str, Path]]) -> Optional[List[bool]]:
+        """
+        複数のサマリーファイルを1回のmultipart POSTでまとめてアップロード
+        Returns: ファイル毎の成否（batchと同順）。バッチAPIが存在しない(404)場合はNone
+        """
+        failed = [False] * len(batch)
+        
+        async def build_body(stack: contextlib.ExitStack) -> aiohttp.FormData:
+            # file/device_id/dateを同じ順序で繰り返し追加する
+            form_data = aiohttp.FormData()
+            for device_id, date, file_path in batch:
+                f = stack.enter_context(await asyncio.to_thread(open, file_path, 'rb'))
+                form_data.add_field('file', f,
+                                    filename=FILENAME,
+                                    content_type=CONTENT_TYPE)
+                form_data.add_field('device_id', device_id)
+                form_data.add_field('date', date)
+            return form_data
+        
+        async def handle(response: aiohttp.ClientResponse) -> Optional[List[bool]]:
+            if response.status == 404:
+                self.logger.warning("バッチアップロードAPIが存在しないため単体アップロードに切り替えます")
+                self._batch_supported = False
+                return None
+            
+            if response.status != 200:
+                error_text = await response.text()
+                self.logger.error("❌ バッチアップロード失敗: %d ファイル - HTTP %d: %s",
+                                  len(batch), response.status, error_text)
+                return failed
+            
+            # レスポンス: {"results": [{"success": bool, ...}, ...]}（batchと同順）
+            body_text = await response.text()
+            try:
+                body = json.loads(body_text)
+            except ValueError:
+                body = None
+            results = body.get("results") if isinstance(body, dict) else None
+            if not isinstance(results, list) or len(results) != len(batch):
+                # ファイル毎の結果が確認できない場合は成功扱いにしない（インデックスにも記録されない）
+                self.logger.error("❌ バッチアップロード結果を解釈できません: %d ファイル - HTTP %d: %s",
+                                  len(batch), response.status, body_text)
+                return failed
+            
+            successes = []
+            for (device_id, date, _), item in zip(batch, results):
+                success = isinstance(item, dict) and bool(item.get("success"))
+                if success:
+                    self.logger.debug("✅ アップロード成功: %s/%s", device_id, date)
+                else:
+                    self.logger.error("❌ アップロード失敗: %s/%s - %s", device_id, date, item)
+                successes.append(success)
+            return successes
+        
+        try:
+            self.logger.debug("バッチアップロード開始: %d ファイル", len(batch))
+            return await self._post_with_retry(session, self.batch_upload_url, build_body, handle,
+                                               f"バッチ {len(batch)} ファイル")
+                    
+        except aiohttp.ClientError as e:
+            self.logger.error("❌ 接続エラー: バッチ %d ファイル - %s", len(batch), e)
+            return failed
+        except FileNotFoundError as e:
+            self.logger.error("❌ ファイルが見つかりません: %s", e.filename)
+            return failed
+        except Exception as e:
+            self.logger.error("❌ 予期しないエラー: バッチ %d ファイル - %s", len(batch), e)
+            return failed
+    
+    def _select_pending_files(self, summary_files: List[Tuple[str, str, Path]]
+                              ) -> Tuple[List[Tuple[str, str, Path]], Dict[str, List[int]]]:
+        """
+        前回アップロード時から変更のないファイルを除外
+        Returns: (アップロード対象ファイル, {インデックスキー: シグネチャ})
+        """
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        pending_files = []
+        signatures: Dict[str, List[int]] = {}
+        for device_id, date, file_path in summary_files:
+            key = self._upload_key(device_id, date)
+            try:
+                signature = self._file_signature(file_path)
+            except FileNotFoundError:
+                continue
+            if not self.force and self._uploaded.get(key) == signature:
+                if debug:
+                    self.logger.debug("変更なしのためスキップ: %s/%s", device_id, date)
+                continue
+            signatures[key] = signature
+            pending_files.append((device_id, date, file_path))
+        return pending_files, signatures
+    
     async def upload_all_summaries(self) -> Dict[str, int]:
         """
         全てのサマリーファイルを並列アップロード
+        探索（プロデューサー）とアップロード（ワーカー）をキューで繋ぎ、探索の完了を待たずにアップロードを開始する
         """
-        summary_files = self.find_all_summary_files()
-        
-        if not summary_files:
-            self.logger.warning("アップロードするファイルがありません")
-            return {"success": 0, "failed": 0, "total": 0}
+        session = await self._get_session()
         
+        queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+        num_workers = self.concurrency
+        signatures: Dict[str, List[int]] = {}
+        found_count = 0
+        pending_count = 0
         success_count = 0
         failed_count = 0
         
-        # SSL設定を含むConnectorを作成
-        connector = aiohttp.TCPConnector(
-            ssl=self.ssl_context if not self.verify_ssl else True
-        )
-        
-        async with aiohttp.ClientSession(connector=connector) as session:
-            # 並列アップロード実行
-            tasks = []
-            for device_id, date, file_path in summary_files:
-                task = self.upload_summary_file(session, device_id, date, file_path)
-                tasks.append((device_id, date, task))
+        async def _produce() -> None:
+            nonlocal found_count, pending_count
+            try:
+                # ディレクトリ探索・stat はブロッキングI/Oのためデバイス単位でスレッド実行
+                batch: List[Tuple[str, str, Path]] = []
+                devices = await asyncio.to_thread(self._list_devices)
+                for device_id, device_path in devices:
+                    device_files = await asyncio.to_thread(self._find_device_summary_files,
+                                                           device_id, device_path)
+                    pending_files, device_signatures = await asyncio.to_thread(
+                        self._select_pending_files, device_files)
+                    found_count += len(device_files)
+                    pending_count += len(pending_files)
+                    signatures.update(device_signatures)
+                    
+                    for summary_file in pending_files:
+                        batch.append(summary_file)
+                        if len(batch) >= self.batch_size:
+                            await queue.put(batch)
+                            batch = []
+                if batch:
+                    await queue.put(batch)
+            finally:
+                # 探索が失敗してもワーカーが終了できるよう終端を送る
+                # （キャンセル時はワーカーも同時にキャンセルされるため送らない）
+                if not asyncio.current_task().cancelling():
+                    for _ in range(num_workers):
+                        await queue.put(None)
+        
+        # 同時実行数の制限はPOSTの試行毎に_post_with_retry内で行う
+        async def _bounded(device_id: str, date: str, file_path: Path) -> Tuple[str, str, bool]:
+            success = await self.upload_summary_file(session, device_id, date, file_path)
+            return device_id, date, success
+        
+        async def _upload_batch(batch: List[Tuple[str, str, Path]]) -> List[Tuple[str, str, bool]]:
+            if len(batch) > 1 and self._batch_supported:
+                successes = await self.upload_summary_batch(session, batch)
+                if successes is not None:
+                    return [(device_id, date, success)
+                            for (device_id, date, _), success in zip(batch, successes)]
+            # バッチAPI非対応時は単体アップロードにフォールバック
+            return list(await asyncio.gather(*[_bounded(*summary_file) for summary_file in batch]))
+        
+        async def _worker() -> None:
+            nonlocal success_count, failed_count
+            while (batch := await queue.get()) is not None:
+                # 完了順に結果を集計
+                for device_id, date, success in await _upload_batch(batch):
+                    if success:
+                        success_count += 1
+                        key = self._upload_key(device_id, date)
+                        self._uploaded[key] = signatures[key]
+                    else:
+                        failed_count += 1
+                    
+                    # ファイル毎ではなく一定件数毎に進捗をまとめて出力
+                    done = success_count + failed_count
+                    if done % _PROGRESS_INTERVAL == 0:
+                        self.logger.info("進捗: %d 件完了 (成功 %d, 失敗 %d)",
+                                         done, success_count, failed_count)
+        
+        # 同時実行数をサーバーの応答に合わせて調整しながら並列アップロード実行
+        self._admission = asyncio.Condition()
+        self._inflight = 0
+        self._cmax = self.concurrency
+        self._success_streak = 0
+        self._shrink_epoch = 0
+        
+        producer = asyncio.create_task(_produce())
+        workers = [asyncio.create_task(_worker()) for _ in range(num_workers)]
+        try:
+            await asyncio.gather(*workers)
+            # 探索中の例外はここで送出
+            await producer
+        finally:
+            # いずれかが失敗・キャンセルされた場合に残りのタスクが待ち続けないよう後始末する
+            for task in (producer, *workers):
+                task.cancel()
+            await asyncio.gather(producer, *workers, return_exceptions=True)
+            self._admission = None
             
-            # 結果収集
-            for device_id, date, task in tasks:
-                success = await task
-                if success:
-                    success_count += 1
-                else:
-                    failed_count += 1
+            if success_count:
+                await asyncio.to_thread(self._save_upload_state)
+        
+        self.logger.info("合計 %d 個のサマリーファイルを発見", found_count)
+        skipped_count = found_count - pending_count
+        if skipped_count:
+            self.logger.info("%d 個のファイルはアップロード済みのためスキップ", skipped_count)
+        if found_count == 0:
+            self.logger.warning("アップロードするファイルがありません")
+        elif pending_count:
+            self.logger.info("進捗: %d/%d (成功 %d, 失敗 %d)",
+                             success_count + failed_count, pending_count, success_count, failed_count)
         
         return {
             "success": success_count,
             "failed": failed_count,
-            "total": len(summary_files)
+            "skipped": skipped_count,
+            "total": pending_count
         }
     
     async def upload_specific_summary(self, device_id: str, date: str) -> bool:
@@ -186,16 +641,17 @@ class SEDSummaryUploader:
         file_path = self.find_summary_file(device_id, date)
         
         if not file_path:
-            self.logger.error(f"ファイルが存在しません: {device_id}/{date}")
+            self.logger.error("ファイルが存在しません: %s/%s", device_id, date)
             return False
         
-        # SSL設定を含むConnectorを作成
-        connector = aiohttp.TCPConnector(
-            ssl=self.ssl_context if not self.verify_ssl else True
-        )
-        
-        async with aiohttp.ClientSession(connector=connector) as session:
-            return await self.upload_summary_file(session, device_id, date, file_path)
+        signature = await asyncio.to_thread(self._file_signature, file_path)
+        session = await self._get_session()
+        success = await self.upload_summary_file(session, device_id, date, file_path)
+        if success:
+            self.logger.info("✅ アップロード成功: %s/%s", device_id, date)
+            self._uploaded[self._upload_key(device_id, date)] = signature
+            await asyncio.to_thread(self._save_upload_state)
+        return success
     
     async def run(self, device_id: Optional[str] = None, date: Optional[str] = None) -> Dict[str, int]:
         """
@@ -206,11 +662,12 @@ class SEDSummaryUploader:
         
         if device_id and date:
             # 特定ファイルのアップロード
-            self.logger.info(f"特定ファイルをアップロード: {device_id}/{date}")
+            self.logger.info("特定ファイルをアップロード: %s/%s", device_id, date)
             success = await self.upload_specific_summary(device_id, date)
             return {
                 "success": 1 if success else 0,
                 "failed": 0 if success else 1,
+                "skipped": 0,
                 "total": 1
             }
         else:
@@ -227,13 +684,27 @@ async def main():
     parser.add_argument("--upload-url", 
                        default="https://api.hey-watch.me/upload/analysis/sed-summary", 
                        help="アップロードURL")
+    parser.add_argument("--concurrency", type=int, default=16,
+                       help="同時アップロード数の上限（デフォルト: 16）")
+    parser.add_argument("--batch-size", type=int, default=1,
+                       help="1リクエストにまとめるファイル数（2以上でバッチAPIを使用、デフォルト: 1）")
+    parser.add_argument("--max-attempts", type=int, default=5,
+                       help="429/5xx・接続エラー時の最大試行回数（デフォルト: 5）")
+    parser.add_argument("--raw-body", action="store_true",
+                       help="multipartを使わずJSONを本文として送信（device_id/dateはクエリパラメータ）")
+    parser.add_argument("--ipv4-only", action="store_true",
+                       help="アップロード先への接続をIPv4に限定")
+    parser.add_argument("--force", action="store_true",
+                       help="アップロード済みのファイルも再アップロード")
     parser.add_argument("--verbose", "-v", action="store_true", help="詳細ログ出力")
     
     args = parser.parse_args()
     
-    # ログレベル設定
-    if args.verbose:
-        logging.getLogger().setLevel(logging.DEBUG)
+    # ログ設定
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
     
     # 引数検証
     if (args.device_id and not args.date) or (not args.device_id and args.date):
@@ -248,13 +719,17 @@ async def main():
             return
     
     # アップロード実行
-    uploader = SEDSummaryUploader(args.upload_url)
-    result = await uploader.run(args.device_id, args.date)
+    uploader = SEDSummaryUploader(args.upload_url, concurrency=args.concurrency, force=args.force,
+                                  batch_size=args.batch_size, max_attempts=args.max_attempts,
+                                  raw_body=args.raw_body, ipv4_only=args.ipv4_only)
+    async with contextlib.aclosing(uploader):
+        result = await uploader.run(args.device_id, args.date)
     
     # 結果出力
     print(f"\n📊 アップロード結果")
     print(f"✅ 成功: {result['success']} ファイル")
     print(f"❌ 失敗: {result['failed']} ファイル")
+    print(f"⏭️ スキップ: {result['skipped']} ファイル（アップロード済み）")
     print(f"📁 合計: {result['total']} ファイル")
     
     if result['total'] > 0: